@@ -5,36 +5,15 @@ Two players seated at opposite ends of the table, like a real card game on iPad
 
 import streamlit as st
 import streamlit.components.v1 as components
-import random
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+import hashlib
+import logging
+from pathlib import Path
 
-# ============================================================
-# CONFIGURATION
-# ============================================================
-
-COLORS = ["Brown", "Light Blue", "Pink", "Orange", "Red",
-          "Yellow", "Green", "Dark Blue", "Railroad", "Utility"]
-
-PROPERTY_SETS = {
-    "Brown": 2, "Light Blue": 3, "Pink": 3, "Orange": 3, "Red": 3,
-    "Yellow": 3, "Green": 3, "Dark Blue": 2, "Railroad": 4, "Utility": 2
-}
-
-RENT_VALUES = {
-    "Brown": [1, 2], "Light Blue": [1, 2, 3], "Pink": [1, 2, 4],
-    "Orange": [1, 3, 5], "Red": [2, 3, 6], "Yellow": [2, 4, 6],
-    "Green": [2, 4, 7], "Dark Blue": [3, 8],
-    "Railroad": [1, 2, 3, 4], "Utility": [1, 2],
-}
+from game import (COLOR_HEX, PLAYS_PER_TURN, PROPERTY_SETS, RENT_VALUES, check_win, collect_payment,
+                  draw_cards, end_turn, get_current, get_opponent, init_game, log, record, record_hand)
+from history import GameHistory
 
-COLOR_HEX = {
-    "Brown": "#8B4513", "Light Blue": "#87CEEB", "Pink": "#E91E63",
-    "Orange": "#FF9800", "Red": "#F44336", "Yellow": "#FFEB3B",
-    "Green": "#4CAF50", "Dark Blue": "#1565C0", "Railroad": "#455A64", "Utility": "#78909C"
-}
-
-MAX_HAND, PLAYS_PER_TURN = 7, 3
+logger = logging.getLogger(__name__)
 
 # ============================================================
 # PAGE CONFIG - FULL SCREEN TABLETOP
@@ -46,176 +25,69 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Hide all Streamlit UI elements for immersive experience
-st.markdown("""
-<style>
-#MainMenu, footer, header, [data-testid="stToolbar"] { display: none !important; }
-.stDeployButton { display: none !important; }
-[data-testid="stSidebar"] { display: none !important; }
-.block-container { padding: 0 !important; max-width: 100% !important; }
-[data-testid="stAppViewContainer"] { padding: 0 !important; }
-</style>
-""", unsafe_allow_html=True)
-
-# ============================================================
-# DATA CLASSES
-# ============================================================
-
-@dataclass
-class Card:
-    name: str
-    value: int
-    kind: str
-    id: int = 0
-
-@dataclass  
-class PropertyCard(Card):
-    options: List[str] = field(default_factory=list)
-    active_color: Optional[str] = None
-    is_wild: bool = False
-    def __post_init__(self):
-        if self.active_color is None and self.options:
-            self.active_color = self.options[0]
-
-@dataclass
-class ActionCard(Card):
-    action_id: str = ""
-
-@dataclass
-class RentCard(Card):
-    rent_colors: List[str] = field(default_factory=list)
-
-@dataclass
-class BuildingCard(Card):
-    building_type: str = ""
-
-# ============================================================
-# DECK & PLAYER
-# ============================================================
-
-class Deck:
-    def __init__(self):
-        self.cards = []
-        self._build()
-        random.shuffle(self.cards)
-    
-    def draw(self, n):
-        return [self.cards.pop() for _ in range(min(n, len(self.cards)))]
-    
-    def _build(self):
-        card_id = 0
-        props = [("Brown", 1, 2), ("Light Blue", 1, 3), ("Pink", 2, 3), ("Orange", 2, 3),
-                 ("Red", 3, 3), ("Yellow", 3, 3), ("Green", 4, 3), ("Dark Blue", 4, 2),
-                 ("Railroad", 2, 4), ("Utility", 2, 2)]
-        for color, val, count in props:
-            for _ in range(count):
-                self.cards.append(PropertyCard(name=color, value=val, kind="property",
-                                               id=card_id, options=[color], active_color=color))
-                card_id += 1
-        
-        wilds = [("Wild", 1, ["Light Blue", "Brown"]), ("Wild", 2, ["Pink", "Orange"]),
-                 ("Wild", 2, ["Red", "Yellow"]), ("Wild", 4, ["Dark Blue", "Green"]),
-                 ("Wild", 0, COLORS)]
-        for name, val, opts in wilds:
-            self.cards.append(PropertyCard(name=name, value=val, kind="property", id=card_id,
-                                           options=opts, active_color=opts[0], is_wild=True))
-            card_id += 1
-        
-        for v, c in {1: 6, 2: 5, 3: 3, 4: 3, 5: 2, 10: 1}.items():
-            for _ in range(c):
-                self.cards.append(Card(name=f"${v}M", value=v, kind="money", id=card_id))
-                card_id += 1
-        
-        actions = [("Deal Breaker", 5, "DEAL_BREAKER"), ("Sly Deal", 3, "SLY_DEAL"),
-                   ("Debt Collector", 3, "DEBT_COLLECTOR"), ("Birthday", 2, "BIRTHDAY"),
-                   ("Pass Go", 1, "PASS_GO"), ("Double Rent", 1, "DOUBLE_RENT")]
-        for name, val, aid in actions:
-            for _ in range(2):
-                self.cards.append(ActionCard(name=name, value=val, kind="action", id=card_id, action_id=aid))
-                card_id += 1
-        
-        rents = [("Rent", 1, ["Light Blue", "Brown"]), ("Rent", 1, ["Pink", "Orange"]),
-                 ("Rent", 1, ["Red", "Yellow"]), ("Rent", 3, ["Any"])]
-        for name, val, cols in rents:
-            self.cards.append(RentCard(name=name, value=val, kind="rent", id=card_id, rent_colors=cols))
-            card_id += 1
-
-class Player:
-    def __init__(self, name):
-        self.name = name
-        self.hand = []
-        self.bank = []
-        self.props = {}
-    
-    def bank_total(self):
-        return sum(c.value for c in self.bank)
-    
-    def full_sets(self):
-        return [c for c in COLORS if len(self.props.get(c, [])) >= PROPERTY_SETS[c]]
-
 # ============================================================
-# GAME LOGIC
+# STATIC ASSETS - built once per process, shared by all sessions
 # ============================================================
 
-def init_game(p1_name="Player 1", p2_name="Player 2"):
-    d = Deck()
-    p1, p2 = Player(p1_name), Player(p2_name)
-    p1.hand = d.draw(5)
-    p2.hand = d.draw(5)
-    return {
-        "deck": d,
-        "p1": p1, "p2": p2,
-        "current": 1,  # 1 or 2
-        "plays_left": PLAYS_PER_TURN,
-        "phase": "TURN_START",
-        "round": 1,
-        "winner": None,
-        "log": []
-    }
-
-def get_current(g):
-    return g["p1"] if g["current"] == 1 else g["p2"]
-
-def get_opponent(g):
-    return g["p2"] if g["current"] == 1 else g["p1"]
-
-def log(g, msg):
-    g["log"] = g["log"][-10:] + [msg]
+STATIC_DIR = Path(__file__).parent / "static"
+
+# Poppins weights used by the tabletop, self-hosted in static/fonts/
+FONT_FILES = {400: "Poppins-Regular.woff2", 600: "Poppins-SemiBold.woff2", 700: "Poppins-Bold.woff2"}
+
+def static_url(rel_path):
+    """URL for a file in static/; the ?v= content hash busts stale browser caches"""
+    digest = hashlib.md5((STATIC_DIR / rel_path).read_bytes(), usedforsecurity=False).hexdigest()[:12]
+    return f"app/static/{rel_path}?v={digest}"
+
+@st.cache_resource
+def chrome_css():
+    return f"<style>\n{(STATIC_DIR / 'chrome.css').read_text()}</style>"
+
+@st.cache_resource
+def tabletop_css():
+    """Tabletop stylesheet with local @font-face rules (no remote font requests)"""
+    faces = []
+    for weight, fname in FONT_FILES.items():
+        stem = fname.rsplit(".", 1)[0]
+        src = f"local('{stem.replace('-', ' ')}'), local('{stem}')"
+        if (STATIC_DIR / "fonts" / fname).exists():
+            src += f", url('{static_url('fonts/' + fname)}') format('woff2')"
+        faces.append(f"@font-face {{ font-family:'Poppins'; font-weight:{weight}; "
+                     f"font-display:swap; src:{src}; }}")
+    return "\n".join(faces) + "\n" + (STATIC_DIR / "tabletop.css").read_text()
+
+START_SCREEN_HTML = """
+    <div style="display:flex;align-items:center;justify-content:center;min-height:80vh;flex-direction:column;">
+        <div style="background:linear-gradient(145deg,#c41e3a,#8b0000);padding:30px 60px;border-radius:20px;
+                    border:5px solid #ffd700;box-shadow:0 15px 50px rgba(0,0,0,0.5);text-align:center;">
+            <div style="font-size:52px;font-weight:900;color:#fff;text-shadow:3px 3px 0 #000;
+                        font-family:serif;letter-spacing:3px;">MONOPOLY</div>
+            <div style="font-size:28px;font-weight:700;color:#ffd700;letter-spacing:12px;">DEAL</div>
+        </div>
+        <div style="margin-top:30px;color:#666;font-size:14px;">Tabletop Edition</div>
+    </div>
+    """
 
-def collect_payment(g, payer, payee, amt):
-    paid = 0
-    while paid < amt and payer.bank:
-        c = payer.bank.pop(0)
-        payee.bank.append(c)
-        paid += c.value
-    while paid < amt:
-        found = False
-        for color in list(payer.props.keys()):
-            if payer.props[color]:
-                c = payer.props[color].pop(0)
-                if not payer.props[color]:
-                    del payer.props[color]
-                payee.props.setdefault(c.active_color or color, []).append(c)
-                paid += c.value
-                found = True
-                break
-        if not found:
-            break
-    return paid
+# Winner banner; {winner} is filled in per game
+WINNER_SCREEN_TEMPLATE = """
+    <div style="display:flex;align-items:center;justify-content:center;min-height:60vh;flex-direction:column;">
+        <div style="font-size:72px;">🏆</div>
+        <div style="font-size:36px;font-weight:bold;color:#ffd700;margin:20px 0;">{winner} WINS!</div>
+        <div style="color:#888;">Collected 3 complete property sets!</div>
+    </div>
+    """
 
-def end_turn(g):
-    g["current"] = 2 if g["current"] == 1 else 1
-    g["phase"] = "TURN_START"
-    g["plays_left"] = PLAYS_PER_TURN
-    if g["current"] == 1:
-        g["round"] += 1
+@st.cache_resource
+def game_history():
+    """Shared history sink, or None (play without recording) if the DB can't be opened"""
+    try:
+        return GameHistory(Path(__file__).parent / "game_history.db")
+    except Exception:
+        logger.exception("Game history disabled: could not open game_history.db")
+        return None
 
-def check_win(g):
-    for p in [g["p1"], g["p2"]]:
-        if len(p.full_sets()) >= 3:
-            g["winner"] = p.name
-            return True
-    return False
+# Hide all Streamlit UI elements for immersive experience
+st.markdown(chrome_css(), unsafe_allow_html=True)
 
 # ============================================================
 # TABLETOP HTML RENDERER
@@ -341,129 +213,7 @@ def render_tabletop(g):
     <html>
     <head>
     <style>
-        @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@400;600;700&display=swap');
-        * {{ margin:0; padding:0; box-sizing:border-box; font-family:'Poppins',sans-serif; }}
-        body {{
-            background: 
-                radial-gradient(ellipse at 50% 50%, #2d5a3d 0%, #1a472a 50%, #0d2818 100%);
-            min-height: 100vh;
-            display: flex;
-            flex-direction: column;
-            overflow: hidden;
-        }}
-        
-        /* Wood trim around table */
-        body::before {{
-            content: '';
-            position: fixed;
-            inset: 0;
-            border: 15px solid;
-            border-image: linear-gradient(145deg, #8b6914, #5d4037, #8b6914) 1;
-            pointer-events: none;
-            z-index: 1000;
-        }}
-        
-        .player-area {{
-            padding: 15px 20px;
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }}
-        
-        .player-area.top {{
-            transform: rotate(180deg);
-            background: linear-gradient(180deg, rgba(0,0,0,0.3) 0%, transparent 100%);
-        }}
-        
-        .player-area.bottom {{
-            background: linear-gradient(0deg, rgba(0,0,0,0.3) 0%, transparent 100%);
-        }}
-        
-        .player-info {{
-            background: rgba(0,0,0,0.5);
-            border-radius: 10px;
-            padding: 10px 15px;
-            color: #fff;
-            min-width: 120px;
-            text-align: center;
-        }}
-        
-        .player-name {{
-            font-weight: 700;
-            font-size: 14px;
-            margin-bottom: 5px;
-        }}
-        
-        .player-stats {{
-            font-size: 11px;
-            opacity: 0.9;
-        }}
-        
-        .cards-area {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 5px;
-            flex: 1;
-            justify-content: center;
-            align-items: center;
-        }}
-        
-        .section-label {{
-            background: rgba(0,0,0,0.4);
-            color: #ffd700;
-            padding: 3px 10px;
-            border-radius: 5px;
-            font-size: 10px;
-            font-weight: 600;
-            margin-right: 10px;
-        }}
-        
-        .center-area {{
-            flex: 1;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 50px;
-            padding: 20px;
-        }}
-        
-        .deck-area {{
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-        }}
-        
-        .turn-indicator {{
-            background: linear-gradient(145deg, #ffd700, #ff8c00);
-            color: #000;
-            padding: 15px 30px;
-            border-radius: 15px;
-            font-weight: 700;
-            font-size: 16px;
-            box-shadow: 0 5px 20px rgba(255,215,0,0.4);
-            text-align: center;
-        }}
-        
-        .plays-left {{
-            font-size: 12px;
-            margin-top: 5px;
-            opacity: 0.8;
-        }}
-        
-        .active-player {{
-            box-shadow: 0 0 20px rgba(255,215,0,0.6);
-            border: 2px solid #ffd700;
-        }}
-        
-        .hand-area {{
-            padding: 15px;
-            background: rgba(0,0,0,0.2);
-            display: flex;
-            justify-content: center;
-            flex-wrap: wrap;
-            gap: 8px;
-            min-height: 130px;
-        }}
+    {tabletop_css()}
     </style>
     </head>
     <body>
@@ -529,17 +279,7 @@ if "game" not in st.session_state:
 
 # Start screen
 if st.session_state.game is None:
-    st.markdown("""
-    <div style="display:flex;align-items:center;justify-content:center;min-height:80vh;flex-direction:column;">
-        <div style="background:linear-gradient(145deg,#c41e3a,#8b0000);padding:30px 60px;border-radius:20px;
-                    border:5px solid #ffd700;box-shadow:0 15px 50px rgba(0,0,0,0.5);text-align:center;">
-            <div style="font-size:52px;font-weight:900;color:#fff;text-shadow:3px 3px 0 #000;
-                        font-family:serif;letter-spacing:3px;">MONOPOLY</div>
-            <div style="font-size:28px;font-weight:700;color:#ffd700;letter-spacing:12px;">DEAL</div>
-        </div>
-        <div style="margin-top:30px;color:#666;font-size:14px;">Tabletop Edition</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(START_SCREEN_HTML, unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
@@ -548,7 +288,7 @@ if st.session_state.game is None:
         p2 = st.text_input("Player 2 (Top):", value="Player 2", key="p2_name")
         
         if st.button("🎮 START GAME", use_container_width=True, type="primary"):
-            st.session_state.game = init_game(p1, p2)
+            st.session_state.game = init_game(p1, p2, history=game_history())
             st.rerun()
     
     st.stop()
@@ -559,13 +299,7 @@ g = st.session_state.game
 # Check winner
 if g["winner"]:
     st.balloons()
-    st.markdown(f"""
-    <div style="display:flex;align-items:center;justify-content:center;min-height:60vh;flex-direction:column;">
-        <div style="font-size:72px;">🏆</div>
-        <div style="font-size:36px;font-weight:bold;color:#ffd700;margin:20px 0;">{g['winner']} WINS!</div>
-        <div style="color:#888;">Collected 3 complete property sets!</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(WINNER_SCREEN_TEMPLATE.format(winner=g["winner"]), unsafe_allow_html=True)
     if st.button("🔄 New Game", use_container_width=True):
         st.session_state.game = None
         st.rerun()
@@ -575,7 +309,8 @@ if g["winner"]:
 if g["phase"] == "TURN_START":
     player = get_current(g)
     draw_n = 5 if len(player.hand) == 0 else 2
-    player.hand.extend(g["deck"].draw(draw_n))
+    draw_cards(g, player, draw_n)
+    record_hand(g, player)
     g["phase"] = "PLAY"
     g["plays_left"] = PLAYS_PER_TURN
     log(g, f"{player.name} drew {draw_n} cards")
@@ -618,6 +353,7 @@ with col2:
                 # Play button
                 if st.button("▶️ Play", key=f"play_{idx}", disabled=g["plays_left"]<=0, use_container_width=True):
                     opponent = get_opponent(g)
+                    record(g, current, "play", card)
                     if card.kind == "money":
                         current.hand.pop(idx)
                         current.bank.append(card)
@@ -637,12 +373,13 @@ with col2:
                             rent = RENT_VALUES.get(color, [1])
                             amt = rent[min(count, len(rent))-1] if count > 0 else 0
                             collect_payment(g, opponent, current, amt)
+                            record(g, current, "rent", color=color, amount=amt)
                             log(g, f"{current.name} collected ${amt}M rent!")
                     elif card.kind == "action":
                         current.hand.pop(idx)
                         aid = getattr(card, 'action_id', '')
                         if aid == "PASS_GO":
-                            current.hand.extend(g["deck"].draw(2))
+                            draw_cards(g, current, 2)
                             log(g, f"{current.name} drew 2 cards!")
                         elif aid == "BIRTHDAY":
                             collect_payment(g, opponent, current, 2)
@@ -675,6 +412,7 @@ with col2:
                 if st.button("🏦 Bank", key=f"bank_{idx}", disabled=g["plays_left"]<=0, use_container_width=True):
                     c = current.hand.pop(idx)
                     current.bank.append(c)
+                    record(g, current, "bank", c)
                     g["plays_left"] -= 1
                     log(g, f"Banked ${c.value}M")
                     st.rerun()
@@ -0,0 +1,240 @@
+"""
+Monopoly Deal - cards, deck, players and game rules
+Game state is a plain dict (see init_game); the Streamlit UI lives in app.py
+"""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional
+
+# ============================================================
+# CONFIGURATION
+# ============================================================
+
+COLORS = ["Brown", "Light Blue", "Pink", "Orange", "Red",
+          "Yellow", "Green", "Dark Blue", "Railroad", "Utility"]
+
+PROPERTY_SETS = {
+    "Brown": 2, "Light Blue": 3, "Pink": 3, "Orange": 3, "Red": 3,
+    "Yellow": 3, "Green": 3, "Dark Blue": 2, "Railroad": 4, "Utility": 2
+}
+
+RENT_VALUES = {
+    "Brown": [1, 2], "Light Blue": [1, 2, 3], "Pink": [1, 2, 4],
+    "Orange": [1, 3, 5], "Red": [2, 3, 6], "Yellow": [2, 4, 6],
+    "Green": [2, 4, 7], "Dark Blue": [3, 8],
+    "Railroad": [1, 2, 3, 4], "Utility": [1, 2],
+}
+
+COLOR_HEX = {
+    "Brown": "#8B4513", "Light Blue": "#87CEEB", "Pink": "#E91E63",
+    "Orange": "#FF9800", "Red": "#F44336", "Yellow": "#FFEB3B",
+    "Green": "#4CAF50", "Dark Blue": "#1565C0", "Railroad": "#455A64", "Utility": "#78909C"
+}
+
+MAX_HAND, PLAYS_PER_TURN = 7, 3
+
+# ============================================================
+# DATA CLASSES
+# ============================================================
+
+@dataclass
+class Card:
+    name: str
+    value: int
+    kind: str
+    id: int = 0
+
+@dataclass  
+class PropertyCard(Card):
+    options: List[str] = field(default_factory=list)
+    active_color: Optional[str] = None
+    is_wild: bool = False
+    def __post_init__(self):
+        if self.active_color is None and self.options:
+            self.active_color = self.options[0]
+
+@dataclass
+class ActionCard(Card):
+    action_id: str = ""
+
+@dataclass
+class RentCard(Card):
+    rent_colors: List[str] = field(default_factory=list)
+
+@dataclass
+class BuildingCard(Card):
+    building_type: str = ""
+
+# ============================================================
+# DECK & PLAYER
+# ============================================================
+
+class Deck:
+    def __init__(self):
+        self.cards = []
+        self._build()
+        random.shuffle(self.cards)
+    
+    def draw(self, n):
+        return [self.cards.pop() for _ in range(min(n, len(self.cards)))]
+    
+    def _build(self):
+        card_id = 0
+        props = [("Brown", 1, 2), ("Light Blue", 1, 3), ("Pink", 2, 3), ("Orange", 2, 3),
+                 ("Red", 3, 3), ("Yellow", 3, 3), ("Green", 4, 3), ("Dark Blue", 4, 2),
+                 ("Railroad", 2, 4), ("Utility", 2, 2)]
+        for color, val, count in props:
+            for _ in range(count):
+                self.cards.append(PropertyCard(name=color, value=val, kind="property",
+                                               id=card_id, options=[color], active_color=color))
+                card_id += 1
+        
+        wilds = [("Wild", 1, ["Light Blue", "Brown"]), ("Wild", 2, ["Pink", "Orange"]),
+                 ("Wild", 2, ["Red", "Yellow"]), ("Wild", 4, ["Dark Blue", "Green"]),
+                 ("Wild", 0, COLORS)]
+        for name, val, opts in wilds:
+            self.cards.append(PropertyCard(name=name, value=val, kind="property", id=card_id,
+                                           options=opts, active_color=opts[0], is_wild=True))
+            card_id += 1
+        
+        for v, c in {1: 6, 2: 5, 3: 3, 4: 3, 5: 2, 10: 1}.items():
+            for _ in range(c):
+                self.cards.append(Card(name=f"${v}M", value=v, kind="money", id=card_id))
+                card_id += 1
+        
+        actions = [("Deal Breaker", 5, "DEAL_BREAKER"), ("Sly Deal", 3, "SLY_DEAL"),
+                   ("Debt Collector", 3, "DEBT_COLLECTOR"), ("Birthday", 2, "BIRTHDAY"),
+                   ("Pass Go", 1, "PASS_GO"), ("Double Rent", 1, "DOUBLE_RENT")]
+        for name, val, aid in actions:
+            for _ in range(2):
+                self.cards.append(ActionCard(name=name, value=val, kind="action", id=card_id, action_id=aid))
+                card_id += 1
+        
+        rents = [("Rent", 1, ["Light Blue", "Brown"]), ("Rent", 1, ["Pink", "Orange"]),
+                 ("Rent", 1, ["Red", "Yellow"]), ("Rent", 3, ["Any"])]
+        for name, val, cols in rents:
+            self.cards.append(RentCard(name=name, value=val, kind="rent", id=card_id, rent_colors=cols))
+            card_id += 1
+
+class Player:
+    def __init__(self, name):
+        self.name = name
+        self.hand = []
+        self.bank = []
+        self.props = {}
+    
+    def bank_total(self):
+        return sum(c.value for c in self.bank)
+    
+    def full_sets(self):
+        return [c for c in COLORS if len(self.props.get(c, [])) >= PROPERTY_SETS[c]]
+
+# ============================================================
+# GAME LOGIC
+# ============================================================
+
+def init_game(p1_name="Player 1", p2_name="Player 2", history=None):
+    d = Deck()
+    p1, p2 = Player(p1_name), Player(p2_name)
+    g = {
+        "id": uuid.uuid4().hex,
+        "deck": d,
+        "p1": p1, "p2": p2,
+        "current": 1,  # 1 or 2
+        "plays_left": PLAYS_PER_TURN,
+        "phase": "TURN_START",
+        "round": 1,
+        "winner": None,
+        "completed_sets": {1: set(), 2: set()},
+        "history": history,  # optional GameHistory sink
+        "log": []
+    }
+    if history:
+        history.start_game(g["id"], p1_name, p2_name)
+    draw_cards(g, p1, 5)
+    draw_cards(g, p2, 5)
+    return g
+
+def get_current(g):
+    return g["p1"] if g["current"] == 1 else g["p2"]
+
+def get_opponent(g):
+    return g["p2"] if g["current"] == 1 else g["p1"]
+
+def log(g, msg):
+    g["log"] = g["log"][-10:] + [msg]
+
+def seat(g, player):
+    return 1 if player is g["p1"] else 2
+
+def card_type(card):
+    return card.action_id if card.kind == "action" else card.kind.upper()
+
+def record(g, player, event, card=None, color=None, amount=None):
+    """Send an event to the game history store, if one is attached"""
+    if g.get("history"):
+        if card is not None and color is None:
+            color = getattr(card, "active_color", None)
+        g["history"].record(g["id"], g["round"], seat(g, player), event,
+                            card_type(card) if card else None, color, amount)
+
+def record_hand(g, player):
+    """Snapshot the card types the player holds this round"""
+    if g.get("history"):
+        g["history"].record_hand(g["id"], g["round"], seat(g, player),
+                                 [card_type(c) for c in player.hand])
+
+def draw_cards(g, player, n):
+    cards = g["deck"].draw(n)
+    player.hand.extend(cards)
+    for c in cards:
+        record(g, player, "draw", c)
+    return len(cards)
+
+def collect_payment(g, payer, payee, amt):
+    paid = 0
+    while paid < amt and payer.bank:
+        c = payer.bank.pop(0)
+        payee.bank.append(c)
+        paid += c.value
+    while paid < amt:
+        found = False
+        for color in list(payer.props.keys()):
+            if payer.props[color]:
+                c = payer.props[color].pop(0)
+                if not payer.props[color]:
+                    del payer.props[color]
+                payee.props.setdefault(c.active_color or color, []).append(c)
+                paid += c.value
+                found = True
+                break
+        if not found:
+            break
+    record(g, payer, "payment", amount=paid)
+    return paid
+
+def end_turn(g):
+    g["current"] = 2 if g["current"] == 1 else 1
+    g["phase"] = "TURN_START"
+    g["plays_left"] = PLAYS_PER_TURN
+    if g["current"] == 1:
+        g["round"] += 1
+
+def check_win(g):
+    for p in [g["p1"], g["p2"]]:
+        done = g["completed_sets"][seat(g, p)]
+        done.intersection_update(p.full_sets())  # forget sets lost to payments or steals
+        for color in p.full_sets():
+            if color not in done:
+                done.add(color)
+                record(g, p, "set_complete", color=color)
+    for p in [g["p1"], g["p2"]]:
+        if len(p.full_sets()) >= 3:
+            g["winner"] = p.name
+            record(g, p, "win")
+            if g.get("history"):
+                g["history"].finish_game(g["id"], seat(g, p), g["round"])
+            return True
+    return False
@@ -0,0 +1,296 @@
+"""
+Game history store - batches game events into SQLite for cross-game analytics
+Writes happen on a background thread so recording never blocks gameplay
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# SCHEMA
+# ============================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    game_id     TEXT PRIMARY KEY,
+    p1_name     TEXT,
+    p2_name     TEXT,
+    started_at  REAL,
+    finished_at REAL,
+    winner      INTEGER,          -- seat 1 or 2, NULL while unfinished
+    rounds      INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    id        INTEGER PRIMARY KEY,
+    game_id   TEXT NOT NULL,
+    round     INTEGER NOT NULL,
+    player    INTEGER NOT NULL,   -- seat 1 or 2
+    event     TEXT NOT NULL,      -- draw, play, bank, payment, rent, set_complete, win
+    card_type TEXT,               -- action id (DEAL_BREAKER, ...) or MONEY/PROPERTY/RENT
+    color     TEXT,
+    amount    INTEGER,
+    ts        REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_events_game      ON events(game_id, player);
+CREATE INDEX IF NOT EXISTS idx_events_card_type ON events(card_type, event, round);
+CREATE INDEX IF NOT EXISTS idx_events_player    ON events(player, event, card_type);
+CREATE INDEX IF NOT EXISTS idx_games_winner     ON games(winner);
+
+-- Summary tables, kept up to date by the writer thread
+
+-- Card types in each seat's hand per round, for games still being aggregated
+CREATE TABLE IF NOT EXISTS held_cards (
+    game_id   TEXT NOT NULL,
+    player    INTEGER NOT NULL,
+    round     INTEGER NOT NULL,
+    card_type TEXT NOT NULL,
+    PRIMARY KEY (game_id, player, round, card_type)
+) WITHOUT ROWID;
+
+-- Finished seat-games (one per seat per game) where the seat held card_type in
+-- round, and how many of them that seat won
+CREATE TABLE IF NOT EXISTS card_round_stats (
+    card_type  TEXT NOT NULL,
+    round      INTEGER NOT NULL,
+    seat_games INTEGER NOT NULL,
+    wins       INTEGER NOT NULL,
+    PRIMARY KEY (card_type, round)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS card_play_totals (
+    card_type TEXT PRIMARY KEY,
+    plays     INTEGER NOT NULL,
+    round_sum INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS rent_totals (
+    color   TEXT PRIMARY KEY,
+    charges INTEGER NOT NULL,
+    total   INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- Aggregate views over the summary tables
+
+-- Win rate for seats holding a card type in a given round. seat_games counts
+-- seats, so a game where both seats hold the card counts twice.
+CREATE VIEW IF NOT EXISTS win_rate_by_card_round AS
+SELECT card_type, round, seat_games, wins, ROUND(1.0 * wins / seat_games, 4) AS win_rate
+FROM card_round_stats;
+
+-- How often and how early each card type gets played
+CREATE VIEW IF NOT EXISTS card_play_stats AS
+SELECT card_type, plays, ROUND(1.0 * round_sum / plays, 2) AS avg_round
+FROM card_play_totals;
+
+-- Rent collected per color
+CREATE VIEW IF NOT EXISTS rent_by_color AS
+SELECT color, charges, total, ROUND(1.0 * total / charges, 2) AS avg_amount
+FROM rent_totals;
+
+-- Win rate by seat and game length
+CREATE VIEW IF NOT EXISTS seat_win_rate AS
+SELECT rounds, COUNT(*) AS games,
+       ROUND(1.0 * SUM(winner = 1) / COUNT(*), 4) AS p1_win_rate,
+       ROUND(1.0 * SUM(winner = 2) / COUNT(*), 4) AS p2_win_rate
+FROM games WHERE winner IS NOT NULL
+GROUP BY rounds;
+"""
+
+INSERT_GAME = "INSERT OR IGNORE INTO games (game_id, p1_name, p2_name, started_at) VALUES (?, ?, ?, ?)"
+INSERT_EVENT = ("INSERT INTO events (game_id, round, player, event, card_type, color, amount, ts) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+INSERT_HELD = "INSERT OR IGNORE INTO held_cards (game_id, player, round, card_type) VALUES (?, ?, ?, ?)"
+FINISH_GAME = ("UPDATE games SET finished_at = ?, winner = ?, rounds = ? "
+               "WHERE game_id = ? AND winner IS NULL")
+# Fold a finished game's held cards into the per-(card_type, round) counters
+ADD_CARD_ROUNDS = """
+INSERT INTO card_round_stats (card_type, round, seat_games, wins)
+SELECT card_type, round, COUNT(*), SUM(player = ?) FROM held_cards WHERE game_id = ?
+GROUP BY card_type, round
+ON CONFLICT (card_type, round) DO UPDATE
+SET seat_games = seat_games + excluded.seat_games, wins = wins + excluded.wins
+"""
+# Drop hands of games that will never finish: abandoned mid-game, or whose games row was lost
+PRUNE_HELD = """
+DELETE FROM held_cards WHERE game_id IN (
+    SELECT game_id FROM games WHERE winner IS NULL AND started_at < ?
+) OR game_id NOT IN (SELECT game_id FROM games)
+"""
+ADD_PLAYS = """
+INSERT INTO card_play_totals (card_type, plays, round_sum) VALUES (?, ?, ?)
+ON CONFLICT (card_type) DO UPDATE
+SET plays = plays + excluded.plays, round_sum = round_sum + excluded.round_sum
+"""
+ADD_RENT = """
+INSERT INTO rent_totals (color, charges, total) VALUES (?, ?, ?)
+ON CONFLICT (color) DO UPDATE
+SET charges = charges + excluded.charges, total = total + excluded.total
+"""
+
+_STOP = object()
+
+# ============================================================
+# EVENT SINK
+# ============================================================
+
+class GameHistory:
+    """Queue-backed SQLite sink; one writer thread bulk-inserts queued rows
+
+    The queue holds at most max_queue rows. When it is full, rows are dropped and
+    counted in `dropped` so gameplay never waits on the disk; pass block=True to
+    make producers wait instead (e.g. for simulations that need every row).
+    """
+
+    def __init__(self, path="game_history.db", batch_size=5000, poll_interval=0.5,
+                 max_queue=200_000, block=False, stale_after=6 * 3600):
+        self.path = str(path)
+        self.stale_after = stale_after
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.block = block
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._drop_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="game-history-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+        atexit.register(self.close)
+
+    # ---- producers (called from gameplay, never block) ----
+
+    def start_game(self, game_id, p1_name, p2_name):
+        self._put(("game", (game_id, p1_name, p2_name, time.time())))
+
+    def record(self, game_id, round_no, player, event, card_type=None, color=None, amount=None):
+        self._put(("event", (game_id, round_no, player, event, card_type, color,
+                             amount, time.time())))
+
+    def record_hand(self, game_id, round_no, player, card_types):
+        """Snapshot the card types a seat holds in a round (feeds win_rate_by_card_round)"""
+        self._put(("hand", [(game_id, player, round_no, t) for t in set(card_types)]))
+
+    def finish_game(self, game_id, winner, rounds):
+        self._put(("finish", (time.time(), winner, rounds, game_id)))
+
+    def flush(self):
+        """Block until everything queued so far is handled, or the writer has stopped
+
+        Re-raises the last batch write error since the previous flush, if any.
+        """
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and self._thread.is_alive():
+                self._queue.all_tasks_done.wait(self.poll_interval)
+        error, self._error = self._error, None
+        if error:
+            raise error
+
+    def close(self):
+        """Write what is queued and stop the writer; later rows are ignored"""
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _put(self, item):
+        if self._closed:
+            return
+        if self.block:
+            self._queue.put(item)
+            return
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                first = self.dropped == 1
+            if first:
+                logger.warning("Game history queue is full; dropping rows (see GameHistory.dropped)")
+
+    def query(self, sql, params=()):
+        """Run a read-only query on a separate connection (WAL lets it run beside the writer)"""
+        conn = sqlite3.connect(self.path)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    # ---- writer thread ----
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        with conn:
+            conn.execute(PRUNE_HELD, (time.time() - self.stale_after,))
+        return conn
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.poll_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            try:
+                self._write(conn, [item for item in batch if item is not _STOP])
+            except Exception as e:
+                # Drop the batch rather than stall producers
+                self._error = e
+                logger.exception("Dropped %d game history rows", len(batch) - stop)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        conn.close()
+
+    def _write(self, conn, batch):
+        games, events, held, finishes = [], [], [], []
+        for kind, params in batch:
+            if kind == "hand":
+                held.extend(params)
+            else:
+                {"game": games, "event": events, "finish": finishes}[kind].append(params)
+        plays, rent = {}, {}
+        for game_id, round_no, player, event, card_type, color, amount, _ in events:
+            if event == "play" and card_type:
+                n, round_sum = plays.get(card_type, (0, 0))
+                plays[card_type] = (n + 1, round_sum + round_no)
+            elif event == "rent" and color:
+                n, total = rent.get(color, (0, 0))
+                rent[color] = (n + 1, total + (amount or 0))
+        with conn:
+            conn.executemany(INSERT_GAME, games)
+            conn.executemany(INSERT_EVENT, events)
+            conn.executemany(INSERT_HELD, held)
+            conn.executemany(ADD_PLAYS, [(k, *v) for k, v in plays.items()])
+            conn.executemany(ADD_RENT, [(k, *v) for k, v in rent.items()])
+            for finished_at, winner, rounds, game_id in finishes:
+                if conn.execute(FINISH_GAME, (finished_at, winner, rounds, game_id)).rowcount:
+                    conn.execute(ADD_CARD_ROUNDS, (winner, game_id))
+                    conn.execute("DELETE FROM held_cards WHERE game_id = ?", (game_id,))
@@ -0,0 +1,63 @@
+from game import PropertyCard, check_win, collect_payment, init_game
+
+
+class Recorder:
+    """Stand-in history sink that keeps rows in memory"""
+
+    def __init__(self):
+        self.events, self.hands, self.finished = [], [], []
+
+    def start_game(self, game_id, p1_name, p2_name):
+        pass
+
+    def record(self, game_id, round_no, player, event, card_type=None, color=None, amount=None):
+        self.events.append((player, event, card_type, color, amount))
+
+    def record_hand(self, game_id, round_no, player, card_types):
+        self.hands.append((round_no, player, sorted(set(card_types))))
+
+    def finish_game(self, game_id, winner, rounds):
+        self.finished.append((winner, rounds))
+
+
+def brown():
+    return PropertyCard(name="Brown", value=1, kind="property", options=["Brown"])
+
+
+def set_events(history):
+    return [(player, color) for player, event, _, color, _ in history.events if event == "set_complete"]
+
+
+def test_set_lost_and_rebuilt_is_recorded_again():
+    history = Recorder()
+    g = init_game("Ana", "Ben", history=history)
+    p1, p2 = g["p1"], g["p2"]
+    p1.hand, p2.hand = [], []
+    p1.bank, p2.bank = [], []
+    p1.props = {"Brown": [brown(), brown()]}
+
+    check_win(g)
+    check_win(g)  # no change, no new event
+    assert set_events(history) == [(1, "Brown")]
+
+    collect_payment(g, p1, p2, 1)  # pays with a Brown, breaking the set
+    check_win(g)
+    p1.props.setdefault("Brown", []).append(brown())
+    check_win(g)
+    assert set_events(history) == [(1, "Brown"), (1, "Brown")]
+    assert (1, "payment", None, None, 1) in history.events
+
+
+def test_win_is_recorded_once_with_seat_and_round():
+    history = Recorder()
+    g = init_game("Ana", "Ben", history=history)
+    g["p2"].props = {"Brown": [brown(), brown()],
+                     "Dark Blue": [PropertyCard(name="Dark Blue", value=4, kind="property", options=["Dark Blue"])
+                                   for _ in range(2)],
+                     "Utility": [PropertyCard(name="Utility", value=2, kind="property", options=["Utility"])
+                                 for _ in range(2)]}
+
+    assert check_win(g)
+    assert g["winner"] == "Ben"
+    assert history.finished == [(2, 1)]
+    assert [e for e in history.events if e[1] == "win"] == [(2, "win", None, None, None)]
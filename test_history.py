@@ -0,0 +1,108 @@
+import sqlite3
+
+import pytest
+
+from history import GameHistory
+
+
+def play_games(history):
+    # g1: seat 1 holds DEAL_BREAKER in rounds 1-2 and wins
+    history.start_game("g1", "Ana", "Ben")
+    history.record("g1", 1, 1, "draw", "DEAL_BREAKER")
+    history.record_hand("g1", 1, 1, ["DEAL_BREAKER", "DEAL_BREAKER", "MONEY"])  # duplicates count once
+    history.record_hand("g1", 1, 2, ["MONEY"])
+    history.record_hand("g1", 2, 1, ["DEAL_BREAKER"])
+    history.record("g1", 2, 1, "play", "DEAL_BREAKER")
+    history.record("g1", 2, 2, "rent", "RENT", "Red", 3)
+    history.record("g1", 2, 1, "win")
+    history.finish_game("g1", 1, 2)
+    # g2: seat 2 draws DEAL_BREAKER in round 1, still holds it in round 3, and loses
+    history.start_game("g2", "Cem", "Dia")
+    history.record("g2", 1, 2, "draw", "DEAL_BREAKER")
+    history.record_hand("g2", 1, 2, ["DEAL_BREAKER"])
+    history.record_hand("g2", 3, 2, ["DEAL_BREAKER"])
+    history.record("g2", 3, 2, "rent", "RENT", "Red", 5)
+    history.finish_game("g2", 1, 3)
+    history.finish_game("g2", 1, 3)  # repeated finish is ignored
+
+
+def test_records_games_events_and_aggregates(tmp_path):
+    history = GameHistory(tmp_path / "history.db", batch_size=3)
+    play_games(history)
+    history.flush()
+
+    assert history.query("SELECT game_id, p1_name, p2_name, winner, rounds FROM games ORDER BY game_id") == [
+        ("g1", "Ana", "Ben", 1, 2), ("g2", "Cem", "Dia", 1, 3)]
+    assert history.query("SELECT COUNT(*) FROM events") == [(6,)]
+    assert history.query("SELECT player, card_type FROM events WHERE game_id = 'g1' AND event = 'play'") == [
+        (1, "DEAL_BREAKER")]
+
+    assert history.query("SELECT * FROM win_rate_by_card_round WHERE card_type = 'DEAL_BREAKER' ORDER BY round") == [
+        ("DEAL_BREAKER", 1, 2, 1, 0.5), ("DEAL_BREAKER", 2, 1, 1, 1.0), ("DEAL_BREAKER", 3, 1, 0, 0.0)]
+    assert history.query("SELECT * FROM win_rate_by_card_round WHERE card_type = 'MONEY'") == [
+        ("MONEY", 1, 2, 1, 0.5)]
+    assert history.query("SELECT * FROM card_play_stats") == [("DEAL_BREAKER", 1, 2.0)]
+    assert history.query("SELECT * FROM rent_by_color") == [("Red", 2, 8, 4.0)]
+    assert history.query("SELECT COUNT(*) FROM held_cards") == [(0,)]
+    assert history.query("PRAGMA journal_mode") == [("wal",)]
+    history.close()
+
+
+def test_failed_batch_is_logged_and_raised_by_flush(tmp_path, caplog):
+    path = tmp_path / "history.db"
+    history = GameHistory(path)
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE events")
+    conn.close()
+
+    history.record("g1", 1, 1, "bank", "MONEY", amount=1)
+    with pytest.raises(sqlite3.OperationalError):
+        history.flush()
+    assert "Dropped 1 game history rows" in caplog.text
+
+    history.start_game("g1", "Ana", "Ben")
+    history.flush()  # the error is reported once and the writer keeps going
+    history.close()
+    assert history.query("SELECT game_id FROM games") == [("g1",)]
+
+
+def test_rows_after_close_are_ignored(tmp_path):
+    history = GameHistory(tmp_path / "history.db")
+    history.record("g1", 1, 1, "draw", "MONEY")
+    history.close()
+    history.start_game("g2", "Cem", "Dia")
+    history.record("g2", 1, 1, "draw", "MONEY")
+    history.finish_game("g2", 1, 1)
+    history.flush()  # returns even though the writer has stopped
+
+    assert history.query("SELECT game_id FROM events") == [("g1",)]
+    assert history.query("SELECT COUNT(*) FROM games") == [(0,)]
+
+
+def test_full_queue_drops_and_counts_rows(tmp_path):
+    history = GameHistory(tmp_path / "history.db", max_queue=10)
+    for i in range(2000):
+        history.record("g1", 1, 1, "bank", "MONEY", amount=i)
+    history.flush()
+
+    assert history.query("SELECT COUNT(*) FROM events")[0][0] + history.dropped == 2000
+    history.close()
+
+
+def test_startup_prunes_hands_of_abandoned_games(tmp_path):
+    path = tmp_path / "history.db"
+    history = GameHistory(path)
+    history.start_game("old", "Ana", "Ben")
+    history.start_game("live", "Cem", "Dia")
+    history.record_hand("old", 1, 1, ["MONEY"])
+    history.record_hand("live", 1, 1, ["MONEY"])
+    history.record_hand("lost", 1, 1, ["MONEY"])  # its games row never arrived
+    history.close()
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("UPDATE games SET started_at = started_at - 7 * 3600 WHERE game_id = 'old'")
+    conn.close()
+
+    history = GameHistory(path, stale_after=6 * 3600)
+    assert history.query("SELECT game_id FROM held_cards") == [("live",)]
+    history.close()